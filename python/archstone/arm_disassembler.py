@@ -16,6 +16,12 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 '''
 
+from functools import lru_cache
+from struct import iter_unpack
+from types import MethodType
+from typing import Iterator, Union
+
+
 class RawArmInstruction:
     def __init__(self, value: int) -> None:
         self.value = value & 0xFFFFFFFF # Must be big-endian
@@ -28,183 +34,318 @@ class RawArmInstruction:
         return (self.value >> start) & mask
 
 
+# Register names, interned once so operands don't format an int per register
+_REG = tuple(f'r{n}' for n in range(16))
+_CREG = tuple(f'c{n}' for n in range(16))
+_PREG = tuple(f'p{n}' for n in range(16))
+
+
+@lru_cache(maxsize=None)
+def _format_register_list(reg_list: int) -> str:
+    '''Format a register list bitmask as a comma-separated list of registers.'''
+    registers = []
+    
+    while reg_list: # Visit set bits only, lowest first
+        lowest_bit = reg_list & -reg_list
+        registers.append(_REG[lowest_bit.bit_length() - 1])
+        reg_list ^= lowest_bit
+    
+    return ', '.join(registers)
+
+
+# Condition code suffixes, with 'AL' already collapsed to ''
+_COND_SUFFIX = (
+    'EQ', 'NE', 'CS', 'CC', 'MI', 'PL', 'VS', 'VC',
+    'HI', 'LS', 'GE', 'LT', 'GT', 'LE', '', 'NV' # 'NV' cond may be ignored in the future
+)
+
+# Hexadecimal strings for unsigned offsets of up to 12 bits
+_HEX12 = tuple(f'0x{n:x}' for n in range(4096))
+
+# Shift names indexed by the 2-bit shift field
+_SHIFT_NAMES = ('LSL', 'LSR', 'ASR', 'ROR')
+
+# Formatted immediate operands (8-bit value rotated right by twice the 4-bit rotate field), indexed by bits 0-11
+_ROTATED_IMM = tuple(
+    f'#0x{((imm >> rot) | (imm << (32 - rot))) & 0xFFFFFFFF:x}'
+    for rot in range(0, 32, 2) for imm in range(256)
+)
+
+# Load/store mnemonics indexed by bits 20-24 (L, W, B, U and P), with T for post-indexed writeback
+_LOAD_STORE_MNEMONICS = tuple(
+    f"{'LDR' if l else 'STR'}{'B' if b else ''}{'T' if not p and w else ''}"
+    for p in (0, 1) for _u in (0, 1) for b in (0, 1) for w in (0, 1) for l in (0, 1)
+)
+
+# Load/store multiple addressing modes indexed by bits 23-24 (U and P)
+_LOAD_STORE_MULTIPLE_MODES = ('DA', 'IA', 'DB', 'IB')
+
+# Multiply mnemonics indexed by bits 20-21 (S and A)
+_MULTIPLY_MNEMONICS = ('MUL', 'MULS', 'MLA', 'MLAS')
+
+# Multiply long mnemonics indexed by bits 20-22 (S, A and U)
+_MULTIPLY_LONG_MNEMONICS = ('UMULL', 'UMULLS', 'UMLAL', 'UMLALS', 'SMULL', 'SMULLS', 'SMLAL', 'SMLALS')
+
+# Load halfword/signed byte mnemonics indexed by bits 5-6 (H and S)
+_LOAD_HALFWORD_MNEMONICS = ('LDR', 'LDRH', 'LDRSB', 'LDRSH')
+
+# MSR field suffixes indexed by the 4-bit field mask
+_PSR_FIELDS = tuple(
+    ''.join(field for (bit, field) in zip((0b1000, 0b0100, 0b0010, 0b0001), 'fsxc') if field_mask & bit)
+    for field_mask in range(16)
+)
+
+# Pre/post-indexed operand layouts as (separator after Rn, offset sign, closing), indexed by bits 21-24 (P, U and W; bit 22 is ignored)
+_INDEXED_OPERAND_LAYOUTS = tuple(
+    (', ' if p else '], ', '' if u else '-', (']!' if w else ']') if p else '')
+    for p in (0, 1) for u in (0, 1) for _b in (0, 1) for w in (0, 1)
+)
+
+# Data-processing mnemonics with the S suffix applied, indexed by bits 20-24 (compare instructions never show S)
+_DATA_PROCESSING_MNEMONICS = tuple(
+    mnem + ('S' if s and not 8 <= opcode <= 11 else '')
+    for (opcode, mnem) in enumerate((
+        'AND', 'EOR', 'SUB', 'RSB', 'ADD', 'ADC', 'SBC', 'RSC',
+        'TST', 'TEQ', 'CMP', 'CMN', 'ORR', 'MOV', 'BIC', 'MVN'
+    ))
+    for s in (0, 1)
+)
+
+# Bits 20-27 and 4-7 of an ARM instruction, which select its bucket in the decode table
+_DECODE_INDEX_MASK = 0x0FF000F0
+
+# Maximum number of results kept per output case before the cache is restarted
+_RESULT_CACHE_SIZE = 65536
+
+
+def _unpack_words(buf: Union[bytes, bytearray, memoryview]) -> Iterator[tuple]:
+    '''Unpack a buffer of little-endian 32-bit instructions.'''
+    if memoryview(buf).nbytes % 4: # ValueError, like the Thumb disassembler, rather than struct.error
+        raise ValueError('buffer length is not a multiple of the instruction size')
+    
+    return iter_unpack('<I', buf)
+
+
 class Armv4TDisassembler:
-    def get_decoder(self, instr: RawArmInstruction):
-        PATTERNS = [ # (mask, expected_value, decoder)
-            (0x0F000000, 0x0F000000, self.disassemble_software_interrupt),
-            (0x0FFFFFF0, 0x012FFF10, self.disassemble_branch_exchange),
-            (0x0E000000, 0x0A000000, self.disassemble_branch_and_branch_with_link),
-            (0x0F000010, 0x0E000010, self.disassemble_coprocessor_register_transfer),
-            (0x0F000010, 0x0E000000, self.disassemble_coprocessor_data_processing),
-            (0x0E000000, 0x0C000000, self.disassemble_coprocessor_load_and_store),
-            (0x0E000000, 0x08000000, self.disassemble_load_or_store_multiple),
-            (0x0C000000, 0x04000000, self.disassemble_load_or_store),
-            (0x0FC000F0, 0x00000090, self.disassemble_multiply),
-            (0x0F8000F0, 0x00800090, self.disassemble_multiply_long),
-            (0x0FB000F0, 0x01000090, self.disassemble_swap),
-            (0x0D900000, 0x01000000, self.disassemble_move_from_or_to_status_reg),
-            (0x0E000090, 0x00000090, self.disassemble_load_or_store_halfword_or_signed_byte),
-            (0x0C000000, 0x00000000, self.disassemble_data_processing),
+    PATTERNS = ( # (mask, expected_value, decoder name)
+        (0x0F000000, 0x0F000000, 'disassemble_software_interrupt'),
+        (0x0FFFFFF0, 0x012FFF10, 'disassemble_branch_exchange'),
+        (0x0E000000, 0x0A000000, 'disassemble_branch_and_branch_with_link'),
+        (0x0F000010, 0x0E000010, 'disassemble_coprocessor_register_transfer'),
+        (0x0F000010, 0x0E000000, 'disassemble_coprocessor_data_processing'),
+        (0x0E000000, 0x0C000000, 'disassemble_coprocessor_load_and_store'),
+        (0x0E000000, 0x08000000, 'disassemble_load_or_store_multiple'),
+        (0x0C000000, 0x04000000, 'disassemble_load_or_store'),
+        (0x0FC000F0, 0x00000090, 'disassemble_multiply'),
+        (0x0F8000F0, 0x00800090, 'disassemble_multiply_long'),
+        (0x0FB000F0, 0x01000090, 'disassemble_swap'),
+        (0x0D900000, 0x01000000, 'disassemble_move_from_or_to_status_reg'),
+        (0x0E000090, 0x00000090, 'disassemble_load_or_store_halfword_or_signed_byte'),
+        (0x0C000000, 0x00000000, 'disassemble_data_processing'),
+    )
+    
+    def __init__(self) -> None:
+        # Decoders are looked up on the class, so subclasses may override them, and kept unbound so the tables don't reference the instance
+        patterns = [(mask, expected_value, getattr(type(self), name)) for (mask, expected_value, name) in self.PATTERNS]
+        
+        # Patterns split into the 8 groups selected by bits 25-27, keeping their first-match order
+        groups = [
+            [pattern for pattern in patterns if ((group << 25) ^ pattern[1]) & pattern[0] & 0x0E000000 == 0]
+            for group in range(8)
         ]
         
-        # Returns the function (decoder) matching the instruction pattern, or None if no match
-        for (mask, expected_value, decoder) in PATTERNS:
-            if instr.value & mask == expected_value:
-                return decoder
+        # 4096-entry decode table indexed by bits 20-27 and 4-7, built once so decoding is a single lookup
+        self._decode_table = [self._build_decoder(index, groups[index >> 9]) for index in range(4096)]
+        
+        # Disassembly is a pure function of the instruction value, so repeated instructions are served from a cache per output case
+        self._result_cache = {}
+        self._lower_case_result_cache = {}
     
-    def get_cond(self, instr: RawArmInstruction) -> str:
-        CONDITION_CODES = [
-            'EQ', 'NE', 'CS', 'CC', 'MI', 'PL', 'VS', 'VC',
-            'HI', 'LS', 'GE', 'LT', 'GT', 'LE', 'AL', 'NV' # 'NV' cond may be ignored in the future
-        ]
+    def _build_decoder(self, index: int, patterns: list):
+        '''Resolve the decoder of a decode table bucket.'''
+        value = ((index >> 4) << 20) | ((index & 0xF) << 4)
+        candidates = []
+        
+        for (mask, expected_value, decoder) in patterns:
+            if (value ^ expected_value) & mask & _DECODE_INDEX_MASK:
+                continue
+            candidates.append((mask, expected_value, decoder))
+            if not mask & ~_DECODE_INDEX_MASK: # Pattern fully decided by the index bits
+                break
+        
+        if not candidates:
+            return None
+        
+        if len(candidates) == 1 and not candidates[0][0] & ~_DECODE_INDEX_MASK: # Index alone selects the decoder
+            return candidates[0][2]
         
-        cond_code = CONDITION_CODES[instr.get_bits(28, 31)]
+        # Some patterns (e.g. BX) also test bits outside the index, so the bucket keeps the original first-match order
+        def decoder(disassembler: 'Armv4TDisassembler', v: int) -> str:
+            for (mask, expected_value, candidate) in candidates:
+                if v & mask == expected_value:
+                    return candidate(disassembler, v)
         
-        return '' if cond_code == 'AL' else cond_code
+        return decoder
     
-    def disassemble(self, instr: RawArmInstruction, lower_case_output: bool = False) -> str:
-        decoder = self.get_decoder(instr)
+    def get_decoder(self, instr: Union[RawArmInstruction, int]):
+        # Returns the function (decoder) matching the instruction pattern, which takes the instruction value as an int
+        v = instr.value if isinstance(instr, RawArmInstruction) else instr & 0xFFFFFFFF
+        decoder = self._decode_table[((v >> 16) & 0xFF0) | ((v >> 4) & 0xF)]
+        return MethodType(decoder, self) if decoder else None
+    
+    def get_cond(self, instr: Union[RawArmInstruction, int]) -> str:
+        v = instr.value if isinstance(instr, RawArmInstruction) else instr & 0xFFFFFFFF
+        return _COND_SUFFIX[v >> 28]
+    
+    def disassemble(self, instr: Union[RawArmInstruction, int], lower_case_output: bool = False) -> str:
+        value = instr.value if isinstance(instr, RawArmInstruction) else instr & 0xFFFFFFFF
+        result = (self._lower_case_result_cache if lower_case_output else self._result_cache).get(value)
         
-        return (decoder(instr) if decoder else None) or 'UNKNOWN'
+        return result if result is not None else self._disassemble_value(value, lower_case_output)
     
-    def format_addressing_mode1(self, instr: RawArmInstruction) -> str:
-        '''Format Data-processing Operands.'''
-        i = instr.get_bit(25)
+    def _disassemble_value(self, value: int, lower_case_output: bool) -> str:
+        '''Disassemble an instruction missing from the result cache and cache it.'''
+        if lower_case_output: # Derived from the upper case result, so each instruction is decoded only once
+            result = (self._result_cache.get(value) or self._disassemble_value(value, False)).lower()
+            result_cache = self._lower_case_result_cache
+        else:
+            decoder = self.get_decoder(value)
+            result = (decoder(value) if decoder else None) or 'UNKNOWN'
+            result_cache = self._result_cache
         
-        if i: # Immediate operand
-            imm = instr.get_bits(0, 7)
-            rot = instr.get_bits(8, 11) * 2
-            rotated = ((imm >> rot) | (imm << (32 - rot))) & 0xFFFFFFFF
-            return f'#0x{rotated:x}'
+        if len(result_cache) >= _RESULT_CACHE_SIZE: # Bounded, as 32-bit values could otherwise grow it without limit
+            result_cache.clear()
         
-        # Register operand
-        shift_imm = instr.get_bits(7, 11) # In ARM ARM DDI 0100B page 3-84 this appears as 'Rs' instead of 'shift_imm'
-        shift = instr.get_bits(5, 6)
-        shift_name = ['LSL', 'LSR', 'ASR', 'ROR'][shift]
-        rm = instr.get_bits(0, 3)
+        result_cache[value] = result
         
-        if shift_name == 'LSL' and shift_imm == 0:
-            return f'r{rm}'
+        return result
+    
+    def disassemble_bytes(self, buf: Union[bytes, bytearray, memoryview], lower_case_output: bool = False) -> list[str]:
+        '''Disassemble a buffer of little-endian ARM instructions.'''
+        return list(self.disassemble_stream(buf, lower_case_output))
+    
+    def disassemble_stream(self, buf: Union[bytes, bytearray, memoryview], lower_case_output: bool = False) -> Iterator[str]:
+        '''Lazily disassemble a buffer of little-endian ARM instructions.'''
+        get_cached = (self._lower_case_result_cache if lower_case_output else self._result_cache).get
+        disassemble_value = self._disassemble_value
+        
+        for (v,) in _unpack_words(buf):
+            result = get_cached(v)
+            yield result if result is not None else disassemble_value(v, lower_case_output)
+    
+    def format_addressing_mode1(self, v: int) -> str:
+        '''Format Data-processing Operands.'''
+        i = (v >> 25) & 1
         
-        if shift_name == 'ROR' and shift_imm == 0:
-            return f'r{rm}, RRX'
+        if i: # Immediate operand
+            return _ROTATED_IMM[v & 0xFFF]
         
-        if instr.get_bit(4): # Register shift
-            if instr.get_bit(7): # SBZ
+        # Register operand
+        shift_imm = (v >> 7) & 0x1F # In ARM ARM DDI 0100B page 3-84 this appears as 'Rs' instead of 'shift_imm'
+        shift = (v >> 5) & 3
+        shift_name = _SHIFT_NAMES[shift]
+        rm = v & 0xF
+        
+        if shift_imm == 0:
+            if shift == 0: # LSL #0
+                return _REG[rm]
+            if shift == 3: # ROR #0
+                return f'{_REG[rm]}, RRX'
+        
+        if (v >> 4) & 1: # Register shift
+            if (v >> 7) & 1: # SBZ
                 return None
-            rs = instr.get_bits(8, 11)
-            return f'r{rm}, {shift_name} r{rs}'
+            rs = (v >> 8) & 0xF
+            return f'{_REG[rm]}, {shift_name} {_REG[rs]}'
         
         # Immediate shift
-        return f'r{rm}, {shift_name} #{shift_imm}'
+        return f'{_REG[rm]}, {shift_name} #{shift_imm}'
     
-    def format_addressing_mode2(self, instr: RawArmInstruction) -> str:
+    def format_addressing_mode2(self, v: int) -> str:
         '''Format Load and Store Word or Unsigned Byte Addressing Modes.'''
-        i, p, u, w = [instr.get_bit(n) for n in (25, 24, 23, 21)]
-        rn = instr.get_bits(16, 19)
-        sign = '' if u else '-'
+        rn = (v >> 16) & 0xF
+        separator, sign, closing = _INDEXED_OPERAND_LAYOUTS[(v >> 21) & 0xF]
         
-        if not i: # Immediate offset
-            offset = instr.get_bits(0, 11)
-            if p:
-                return f"[r{rn}, #{sign}0x{offset:x}]{'!' if w else ''}"
-            else:
-                return f'[r{rn}], #{sign}0x{offset:x}'
+        if not (v >> 25) & 1: # Immediate offset
+            offset = v & 0xFFF
+            return f'[{_REG[rn]}{separator}#{sign}{_HEX12[offset]}{closing}'
         
         # Register offset
-        if instr.get_bit(4): # SBZ
+        if (v >> 4) & 1: # SBZ
             return None
         
-        shift_imm = instr.get_bits(7, 11)
-        shift = instr.get_bits(5, 6)
-        rm = instr.get_bits(0, 3)
-        shift_name = ['LSL', 'LSR', 'ASR', 'ROR'][shift]
-        
-        if shift_name == 'LSL' and shift_imm == 0:
-            if p:
-                return f"[r{rn}, {sign}r{rm}]{'!' if w else ''}"
-            else:
-                return f'[r{rn}], {sign}r{rm}'
-        
-        if shift_name == 'ROR' and shift_imm == 0:
-            if p:
-                return f"[r{rn}, {sign}r{rm}, RRX]{'!' if w else ''}"
-            else:
-                return f'[r{rn}], {sign}r{rm}, RRX'
-        
-        if p:
-            return f"[r{rn}, {sign}r{rm}, {shift_name} #{shift_imm}]{'!' if w else ''}"
-        else:
-            return f'[r{rn}], {sign}r{rm}, {shift_name} #{shift_imm}'
+        shift_imm = (v >> 7) & 0x1F
+        shift = (v >> 5) & 3
+        rm = v & 0xF
+        shift_name = _SHIFT_NAMES[shift]
+        
+        if shift_imm == 0:
+            if shift == 0: # LSL #0
+                return f'[{_REG[rn]}{separator}{sign}{_REG[rm]}{closing}'
+            if shift == 3: # ROR #0
+                return f'[{_REG[rn]}{separator}{sign}{_REG[rm]}, RRX{closing}'
+        
+        return f'[{_REG[rn]}{separator}{sign}{_REG[rm]}, {shift_name} #{shift_imm}{closing}'
     
-    def format_addressing_mode3(self, instr: RawArmInstruction) -> str:
+    def format_addressing_mode3(self, v: int) -> str:
         '''Format Load and Store Halfword or Load Signed Byte Addressing Modes.'''
-        p, u, i, w = [instr.get_bit(n) for n in (24, 23, 22, 21)]
-        rn = instr.get_bits(16, 19)
-        sign = '' if u else '-'
+        if (v >> 21) & 0b1001 == 0b0001: # Post-indexed with writeback
+            return None
         
-        if i: # Immediate offset
-            imm_high = instr.get_bits(8, 11)
-            imm_low = instr.get_bits(0, 3)
+        rn = (v >> 16) & 0xF
+        separator, sign, closing = _INDEXED_OPERAND_LAYOUTS[(v >> 21) & 0xF]
+        
+        if (v >> 22) & 1: # Immediate offset
+            imm_high = (v >> 8) & 0xF
+            imm_low = v & 0xF
             imm = (imm_high << 4) | imm_low
-            if p:
-                return f"[r{rn}, #{sign}0x{imm:x}]{'!' if w else ''}"
-            elif not w:
-                return f'[r{rn}], #{sign}0x{imm:x}'
-            else:
-                return None
+            return f'[{_REG[rn]}{separator}#{sign}{_HEX12[imm]}{closing}'
         
         # Register offset
-        if instr.get_bits(8, 11) != 0: # SBZ
+        if (v >> 8) & 0xF != 0: # SBZ
             return None
         
-        rm = instr.get_bits(0, 3)
+        rm = v & 0xF
         
-        if p:
-            return f"[r{rn}, {sign}r{rm}]{'!' if w else ''}"
-        elif not w:
-            return f'[r{rn}], {sign}r{rm}'
-        else:
-            return None
+        return f'[{_REG[rn]}{separator}{sign}{_REG[rm]}{closing}'
     
-    def format_addressing_mode4(self, instr: RawArmInstruction) -> str:
+    def format_addressing_mode4(self, v: int) -> str:
         '''Format Load and Store Multiple Addressing Modes.'''
-        p, u = [instr.get_bit(n) for n in (24, 23)]
-        return ['DA', 'IA', 'DB', 'IB'][(p << 1) | u]
+        return _LOAD_STORE_MULTIPLE_MODES[(v >> 23) & 3]
     
-    def format_addressing_mode5(self, instr: RawArmInstruction) -> str:
+    def format_addressing_mode5(self, v: int) -> str:
         '''Format Load and Store Coprocessor Addressing Modes.'''
-        p, u, w = [instr.get_bit(n) for n in (24, 23, 21)]
-        rn = instr.get_bits(16, 19)
-        offset = instr.get_bits(0, 7) * 4
-        sign = '' if u else '-'
-        
-        if p:
-            return f"[r{rn}, #{sign}0x{offset:x}]{'!' if w else ''}"
-        elif not w:
-            return f'[r{rn}], #{sign}0x{offset:x}'
-        else:
+        if (v >> 21) & 0b1001 == 0b0001: # Post-indexed with writeback
             return None
+        
+        rn = (v >> 16) & 0xF
+        separator, sign, closing = _INDEXED_OPERAND_LAYOUTS[(v >> 21) & 0xF]
+        offset = (v & 0xFF) * 4
+        
+        return f'[{_REG[rn]}{separator}#{sign}{_HEX12[offset]}{closing}'
     
-    def disassemble_software_interrupt(self, instr: RawArmInstruction) -> str:
+    def disassemble_software_interrupt(self, v: int) -> str:
         '''Disassemble Software interrupt instructions.'''
-        swi_number = instr.get_bits(0, 23)
+        cond = _COND_SUFFIX[v >> 28]
+        swi_number = v & 0xFFFFFF
         
-        return f'SWI{self.get_cond(instr)} #0x{swi_number:x}'
+        return f'SWI{cond} #0x{swi_number:x}'
     
-    def disassemble_branch_exchange(self, instr: RawArmInstruction) -> str:
+    def disassemble_branch_exchange(self, v: int) -> str:
         '''Disassemble Branch and Exchange instructions.'''
-        if instr.get_bits(8, 19) != 0xFFF: # SBO
+        if (v >> 8) & 0xFFF != 0xFFF: # SBO
             return None
         
-        rm = instr.get_bits(0, 3)
+        cond = _COND_SUFFIX[v >> 28]
+        rm = v & 0xF
         
-        return f'BX{self.get_cond(instr)} r{rm}'
+        return f'BX{cond} {_REG[rm]}'
     
-    def disassemble_branch_and_branch_with_link(self, instr: RawArmInstruction) -> str:
+    def disassemble_branch_and_branch_with_link(self, v: int) -> str:
         '''Disassemble Branch and Branch with link instructions.'''
-        l = instr.get_bit(24)
-        offset = instr.get_bits(0, 23)
+        cond = _COND_SUFFIX[v >> 28]
+        l = (v >> 24) & 1
+        offset = v & 0xFFFFFF
         
         offset <<= 2
         
@@ -213,193 +354,184 @@ class Armv4TDisassembler:
         
         offset = (offset + 8) & 0xFFFFFFFF
         
-        return f"{'BL' if l else 'B'}{self.get_cond(instr)} #0x{offset:x}"
+        return f"{'BL' if l else 'B'}{cond} #0x{offset:x}"
     
-    def disassemble_coprocessor_register_transfer(self, instr: RawArmInstruction) -> str:
+    def disassemble_coprocessor_register_transfer(self, v: int) -> str:
         '''Disassemble Coprocessor register transfer instructions.'''
-        op1 = instr.get_bits(21, 23)
-        l = instr.get_bit(20)
-        crn = instr.get_bits(16, 19)
-        rd = instr.get_bits(12, 15)
-        cp_num = instr.get_bits(8, 11)
-        op2 = instr.get_bits(5, 7)
-        crm = instr.get_bits(0, 3)
-        
-        return f"{'MRC' if l else 'MCR'}{self.get_cond(instr)} p{cp_num}, #{op1}, r{rd}, c{crn}, c{crm}, #{op2}"
+        cond = _COND_SUFFIX[v >> 28]
+        op1 = (v >> 21) & 7
+        l = (v >> 20) & 1
+        crn = (v >> 16) & 0xF
+        rd = (v >> 12) & 0xF
+        cp_num = (v >> 8) & 0xF
+        op2 = (v >> 5) & 7
+        crm = v & 0xF
+        
+        return f"{'MRC' if l else 'MCR'}{cond} {_PREG[cp_num]}, #{op1}, {_REG[rd]}, {_CREG[crn]}, {_CREG[crm]}, #{op2}"
     
-    def disassemble_coprocessor_data_processing(self, instr: RawArmInstruction) -> str:
+    def disassemble_coprocessor_data_processing(self, v: int) -> str:
         '''Disassemble Coprocessor data processing instructions.'''
-        op1 = instr.get_bits(20, 23)
-        crn = instr.get_bits(16, 19)
-        crd = instr.get_bits(12, 15)
-        cp_num = instr.get_bits(8, 11)
-        op2 = instr.get_bits(5, 7)
-        crm = instr.get_bits(0, 3)
-        
-        return f'CDP{self.get_cond(instr)} p{cp_num}, #{op1}, c{crd}, c{crn}, c{crm}, #{op2}'
+        cond = _COND_SUFFIX[v >> 28]
+        op1 = (v >> 20) & 0xF
+        crn = (v >> 16) & 0xF
+        crd = (v >> 12) & 0xF
+        cp_num = (v >> 8) & 0xF
+        op2 = (v >> 5) & 7
+        crm = v & 0xF
+        
+        return f'CDP{cond} {_PREG[cp_num]}, #{op1}, {_CREG[crd]}, {_CREG[crn]}, {_CREG[crm]}, #{op2}'
     
-    def disassemble_coprocessor_load_and_store(self, instr: RawArmInstruction) -> str:
+    def disassemble_coprocessor_load_and_store(self, v: int) -> str:
         '''Disassemble Coprocessor load and store instructions.'''
-        l = instr.get_bit(20)
-        crd = instr.get_bits(12, 15)
-        cp_num = instr.get_bits(8, 11)
-        addressing_mode = self.format_addressing_mode5(instr)
+        cond = _COND_SUFFIX[v >> 28]
+        l = (v >> 20) & 1
+        crd = (v >> 12) & 0xF
+        cp_num = (v >> 8) & 0xF
+        addressing_mode = self.format_addressing_mode5(v)
         
         if not addressing_mode:
             return None
         
-        return f"{'LDC' if l else 'STC'}{self.get_cond(instr)} p{cp_num}, c{crd}, {addressing_mode}"
+        return f"{'LDC' if l else 'STC'}{cond} {_PREG[cp_num]}, {_CREG[crd]}, {addressing_mode}"
     
-    def disassemble_load_or_store_multiple(self, instr: RawArmInstruction) -> str:
+    def disassemble_load_or_store_multiple(self, v: int) -> str:
         '''Disassemble Load/store multiple instructions.'''
-        s, w, l = [instr.get_bit(n) for n in (22, 21, 20)]
-        reg_list = instr.get_bits(0, 15)
-        rn = instr.get_bits(16, 19)
-        addressing_mode = self.format_addressing_mode4(instr)
+        cond = _COND_SUFFIX[v >> 28]
+        s = (v >> 22) & 1
+        w = (v >> 21) & 1
+        l = (v >> 20) & 1
+        reg_list = v & 0xFFFF
+        rn = (v >> 16) & 0xF
+        addressing_mode = self.format_addressing_mode4(v)
         
         if (s and w) or not reg_list or rn == 15:
             return None
         
-        registers = [f'r{i}' for i in range(16) if reg_list & (1 << i)]
-        
-        return f"{'LDM' if l else 'STM'}{addressing_mode}{self.get_cond(instr)} r{rn}{'!' if w else ''}, {{{', '.join(registers)}}}{' ^' if s else ''}"
+        return f"{'LDM' if l else 'STM'}{addressing_mode}{cond} {_REG[rn]}{'!' if w else ''}, {{{_format_register_list(reg_list)}}}{' ^' if s else ''}"
     
-    def disassemble_load_or_store(self, instr: RawArmInstruction) -> str:
+    def disassemble_load_or_store(self, v: int) -> str:
         '''Disassemble Load/Store instructions.'''
-        
-        p, b, w, l = [instr.get_bit(n) for n in (24, 22, 21, 20)]
-        rd = instr.get_bits(12, 15)
-        addressing_mode = self.format_addressing_mode2(instr)
+        cond = _COND_SUFFIX[v >> 28]
+        mnem = _LOAD_STORE_MNEMONICS[(v >> 20) & 0x1F]
+        rd = (v >> 12) & 0xF
+        addressing_mode = self.format_addressing_mode2(v)
         
         if not addressing_mode:
             return None
         
-        return f"{'LDR' if l else 'STR'}{'B' if b else ''}{'T' if not p and w else ''}{self.get_cond(instr)} r{rd}, {addressing_mode}"
+        return f'{mnem}{cond} {_REG[rd]}, {addressing_mode}'
     
-    def disassemble_multiply(self, instr: RawArmInstruction) -> str:
+    def disassemble_multiply(self, v: int) -> str:
         '''Disassemble Multiply instructions.'''
-        a, s = [instr.get_bit(n) for n in (21, 20)]
-        rd = instr.get_bits(16, 19)
-        rs = instr.get_bits(8, 11)
-        rm = instr.get_bits(0, 3)
+        cond = _COND_SUFFIX[v >> 28]
+        a = (v >> 21) & 1
+        mnem = _MULTIPLY_MNEMONICS[(v >> 20) & 3]
+        rd = (v >> 16) & 0xF
+        rs = (v >> 8) & 0xF
+        rm = v & 0xF
         
         if a: # MLA
-            rn = instr.get_bits(12, 15)
+            rn = (v >> 12) & 0xF
             
-            return f"MLA{'S' if s else ''}{self.get_cond(instr)} r{rd}, r{rm}, r{rs}, r{rn}"
+            return f'{mnem}{cond} {_REG[rd]}, {_REG[rm]}, {_REG[rs]}, {_REG[rn]}'
         else: # MUL
-            if instr.get_bits(12, 15) != 0: # SBZ
+            if (v >> 12) & 0xF != 0: # SBZ
                 return None
             
-            return f"MUL{'S' if s else ''}{self.get_cond(instr)} r{rd}, r{rm}, r{rs}"
+            return f'{mnem}{cond} {_REG[rd]}, {_REG[rm]}, {_REG[rs]}'
     
-    def disassemble_multiply_long(self, instr: RawArmInstruction) -> str:
+    def disassemble_multiply_long(self, v: int) -> str:
         '''Disassemble Multiply long instructions.'''
-        u, a, s = [instr.get_bit(n) for n in (22, 21, 20)]
-        rdhi = instr.get_bits(16, 19)
-        rdlo = instr.get_bits(12, 15)
-        rs = instr.get_bits(8, 11)
-        rm = instr.get_bits(0, 3)
-        
-        if u: # Signed
-            return f"{'SMLAL' if a else 'SMULL'}{'S' if s else ''}{self.get_cond(instr)} r{rdlo}, r{rdhi}, r{rm}, r{rs}"
-        else: # Unsigned
-            return f"{'UMLAL' if a else 'UMULL'}{'S' if s else ''}{self.get_cond(instr)} r{rdlo}, r{rdhi}, r{rm}, r{rs}"
-    
-    def disassemble_swap(self, instr: RawArmInstruction) -> str:
+        cond = _COND_SUFFIX[v >> 28]
+        mnem = _MULTIPLY_LONG_MNEMONICS[(v >> 20) & 7]
+        rdhi = (v >> 16) & 0xF
+        rdlo = (v >> 12) & 0xF
+        rs = (v >> 8) & 0xF
+        rm = v & 0xF
+        
+        return f'{mnem}{cond} {_REG[rdlo]}, {_REG[rdhi]}, {_REG[rm]}, {_REG[rs]}'
+    
+    def disassemble_swap(self, v: int) -> str:
         '''Disassemble Swap instructions.'''
-        if instr.get_bits(8, 11) != 0 or instr.get_bits(20, 21) != 0: # SBZ
+        if (v >> 8) & 0xF != 0 or (v >> 20) & 3 != 0: # SBZ
             return None
         
-        b = instr.get_bit(22)
-        rn = instr.get_bits(16, 19)
-        rd = instr.get_bits(12, 15)
-        rm = instr.get_bits(0, 3)
+        cond = _COND_SUFFIX[v >> 28]
+        b = (v >> 22) & 1
+        rn = (v >> 16) & 0xF
+        rd = (v >> 12) & 0xF
+        rm = v & 0xF
         
-        return f"SWP{'B' if b else ''}{self.get_cond(instr)} r{rd}, r{rm}, [r{rn}]"
+        return f"SWP{'B' if b else ''}{cond} {_REG[rd]}, {_REG[rm]}, [{_REG[rn]}]"
     
-    def disassemble_move_from_or_to_status_reg(self, instr: RawArmInstruction) -> str:
+    def disassemble_move_from_or_to_status_reg(self, v: int) -> str:
         '''Disassemble Move from/to Status register instructions.'''
-        r = instr.get_bit(22)
+        cond = _COND_SUFFIX[v >> 28]
+        r = (v >> 22) & 1
         
-        if not instr.get_bit(21): # MRS
-            if instr.get_bits(0, 11) != 0 or instr.get_bits(16, 19) != 0xF: # SBZ/SBO
+        if not (v >> 21) & 1: # MRS
+            if v & 0xFFF != 0 or (v >> 16) & 0xF != 0xF: # SBZ/SBO
                 return None
             
-            rd = instr.get_bits(12, 15)
-            return f"MRS{self.get_cond(instr)} r{rd}, {'SPSR' if r else 'CPSR'}"
+            rd = (v >> 12) & 0xF
+            return f"MRS{cond} {_REG[rd]}, {'SPSR' if r else 'CPSR'}"
         
         else: # MSR
-            if instr.get_bits(12, 15) != 0xF: # SBO
+            if (v >> 12) & 0xF != 0xF: # SBO
                 return None
             
-            i = instr.get_bit(25)
-            field_mask = instr.get_bits(16, 19)
+            i = (v >> 25) & 1
+            field_mask = (v >> 16) & 0xF
             
             if not field_mask:
                 return None
             
-            fields = ''
-            if field_mask & 0b1000:
-                fields += 'f'
-            if field_mask & 0b0100:
-                fields += 's'
-            if field_mask & 0b0010:
-                fields += 'x'
-            if field_mask & 0b0001:
-                fields += 'c'
+            fields = _PSR_FIELDS[field_mask]
             
             if i: # Immediate
-                if instr.get_bits(4, 11) != 0: # SBZ
+                if (v >> 4) & 0xFF != 0: # SBZ
                     return None
                 
-                rot = instr.get_bits(8, 11) * 2
-                imm = instr.get_bits(0, 7)
-                rotated_imm = ((imm >> rot) | (imm << (32 - rot))) & 0xFFFFFFFF
-                
-                return f"MSR{self.get_cond(instr)} {'SPSR' if r else 'CPSR'}_{fields}, #0x{rotated_imm:x}"
+                return f"MSR{cond} {'SPSR' if r else 'CPSR'}_{fields}, {_ROTATED_IMM[v & 0xFFF]}"
             else: # Register
-                rm = instr.get_bits(0, 3)
+                rm = v & 0xF
                 
-                return f"MSR{self.get_cond(instr)} {'SPSR' if r else 'CPSR'}_{fields}, r{rm}"
+                return f"MSR{cond} {'SPSR' if r else 'CPSR'}_{fields}, {_REG[rm]}"
     
-    def disassemble_load_or_store_halfword_or_signed_byte(self, instr: RawArmInstruction) -> str:
+    def disassemble_load_or_store_halfword_or_signed_byte(self, v: int) -> str:
         '''Disassemble Load/Store halfword/signed byte instructions.'''
-        l, s, h = [instr.get_bit(n) for n in (20, 6, 5)]
-        rd = instr.get_bits(12, 15)
-        addressing_mode = self.format_addressing_mode3(instr)
+        cond = _COND_SUFFIX[v >> 28]
+        l = (v >> 20) & 1
+        sh = (v >> 5) & 3
+        rd = (v >> 12) & 0xF
+        addressing_mode = self.format_addressing_mode3(v)
         
-        if not (s or h) or not addressing_mode:
+        if not sh or not addressing_mode:
             return None
         
         if l: # Load
-            return f"LDR{['', 'H', 'SB', 'SH'][(s << 1) | h]}{self.get_cond(instr)} r{rd}, {addressing_mode}"
+            return f'{_LOAD_HALFWORD_MNEMONICS[sh]}{cond} {_REG[rd]}, {addressing_mode}'
         else: # Store
-            if instr.get_bits(5, 6) != 1: # Only STRH is valid
+            if sh != 1: # Only STRH is valid
                 return None
             
-            return f'STRH{self.get_cond(instr)} r{rd}, {addressing_mode}'
+            return f'STRH{cond} {_REG[rd]}, {addressing_mode}'
     
-    def disassemble_data_processing(self, instr: RawArmInstruction) -> str:
+    def disassemble_data_processing(self, v: int) -> str:
         '''Disassemble Data processing instructions.'''
-        OPCODES = [
-            'AND', 'EOR', 'SUB', 'RSB', 'ADD', 'ADC', 'SBC', 'RSC',
-            'TST', 'TEQ', 'CMP', 'CMN', 'ORR', 'MOV', 'BIC', 'MVN'
-        ]
-        
-        i, s = [instr.get_bit(n) for n in (25, 20)]
-        opcode = instr.get_bits(21, 24)
-        mnem = OPCODES[opcode]
-        rn = instr.get_bits(16, 19)
-        rd = instr.get_bits(12, 15)
+        cond = _COND_SUFFIX[v >> 28]
+        opcode = (v >> 21) & 0xF
+        mnem = _DATA_PROCESSING_MNEMONICS[(v >> 20) & 0x1F]
+        rn = (v >> 16) & 0xF
+        rd = (v >> 12) & 0xF
         
-        op2 = self.format_addressing_mode1(instr)
+        op2 = self.format_addressing_mode1(v)
         if not op2:
             return None
         
-        if mnem in ('MOV', 'MVN'):
-            return f"{mnem}{'S' if s else ''}{self.get_cond(instr)} r{rd}, {op2}"
-        elif mnem in ('TST', 'TEQ', 'CMP', 'CMN'):
-            return f'{mnem}{self.get_cond(instr)} r{rn}, {op2}'
+        if opcode & 0b1101 == 0b1101: # MOV, MVN
+            return f'{mnem}{cond} {_REG[rd]}, {op2}'
+        elif opcode & 0b1100 == 0b1000: # TST, TEQ, CMP, CMN
+            return f'{mnem}{cond} {_REG[rn]}, {op2}'
         else:
-            return f"{mnem}{'S' if s else ''}{self.get_cond(instr)} r{rd}, r{rn}, {op2}"
+            return f'{mnem}{cond} {_REG[rd]}, {_REG[rn]}, {op2}'
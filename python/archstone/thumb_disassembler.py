@@ -16,6 +16,12 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 '''
 
+import sys
+from array import array
+from types import MethodType
+from typing import Union
+
+
 class RawThumbInstruction:
     def __init__(self, value: int) -> None:
         self.value = value & 0xFFFF # Must be big-endian
@@ -28,224 +34,267 @@ class RawThumbInstruction:
         return (self.value >> start) & mask
 
 
+# Register names, interned once so operands don't format an int per register
+_REG = tuple(f'r{n}' for n in range(16))
+
+# Hexadecimal strings for unsigned immediates of up to 10 bits, which covers every scaled Thumb offset
+_HEX10 = tuple(f'0x{n:x}' for n in range(1024))
+
+# Register list strings for every 8-bit low-register bitmask, lowest register first
+_REGLIST8 = tuple(', '.join(_REG[n] for n in range(8) if reg_list & (1 << n)) for reg_list in range(256))
+
+# Conditional branch mnemonics indexed by condition code, with BAL written as B
+_COND_BRANCH_MNEMONICS = (
+    'BEQ', 'BNE', 'BCS', 'BCC', 'BMI', 'BPL', 'BVS', 'BVC',
+    'BHI', 'BLS', 'BGE', 'BLT', 'BGT', 'BLE', 'B',   'BNV' # 'NV' cond may be ignored in the future
+)
+
+# Branch target strings (PC + 4 + sign-extended offset), indexed by the raw offset field
+_COND_BRANCH_TARGETS = tuple(f'#0x{((n << 1) - (n & 0x80) * 4 + 4) & 0xFFFFFFFF:x}' for n in range(0x100))
+_BRANCH_TARGETS = tuple(f'0x{((n << 1) - (n & 0x400) * 4 + 4) & 0xFFFFFFFF:x}' for n in range(0x800))
+
+# Mnemonics indexed by the opcode field of their instruction family
+_ADD_OR_SUB_REG_MNEMONICS = ('ADDS', 'SUBS')
+_SHIFT_BY_IMM_MNEMONICS = ('LSLS', 'LSRS', 'ASRS') # Opcode 3 is Add/subtract register
+_IMM_MNEMONICS = ('MOVS', 'CMP', 'ADDS', 'SUBS')
+_DP_REG_MNEMONICS = (
+    'ANDS', 'EORS', 'LSLS', 'LSRS', 'ASRS', 'ADCS', 'SBCS', 'RORS',
+    'TST',  'NEGS', 'CMP',  'CMN',  'ORRS', 'MULS', 'BICS', 'MVNS'
+)
+_SPECIAL_DP_MNEMONICS = ('ADD', 'CMP', 'MOV', 'BX')
+_LOAD_STORE_REG_OFFSET_MNEMONICS = ('STR', 'STRH', 'STRB', 'LDRSB', 'LDR', 'LDRH', 'LDRB', 'LDRSH')
+_LOAD_STORE_WORD_OR_BYTE_MNEMONICS = ('STR', 'LDR', 'STRB', 'LDRB') # Indexed by bits 11-12 (L and B)
+_ADJUST_SP_MNEMONICS = ('ADD', 'SUB')
+
+
 class Thumb1Disassembler: # For ARMv4T, but it's based on ARM ARM DDI 0100D (ARMv5 documentation) due to the inaccuracy of ARM ARM DDI 0100B (ARMv4 documentation)
-    def get_decoder(self, instr: RawThumbInstruction):
-        PATTERNS = [
-            (0xF800, 0x1800, self.disassemble_add_or_sub_reg),
-            (0xE000, 0x0000, self.disassemble_shift_by_imm),
-            (0xE000, 0x2000, self.disassemble_add_or_sub_or_cmp_or_mov_imm),
-            (0xFC00, 0x4000, self.disassemble_dp_reg),
-            (0xFC00, 0x4400, self.disassemble_special_dp),
-            (0xF800, 0x4800, self.disassemble_load_from_literal_pool),
-            (0xF000, 0x5000, self.disassemble_load_or_store_reg_offset),
-            (0xE000, 0x6000, self.disassemble_load_or_store_word_or_byte_imm_offset),
-            (0xF000, 0x8000, self.disassemble_load_or_store_halfword_imm_offset),
-            (0xF000, 0x9000, self.disassemble_load_or_store_to_or_from_stack),
-            (0xF000, 0xA000, self.disassemble_add_to_sp_or_pc),
-            (0xFF00, 0xB000, self.disassemble_adjust_sp),
-            (0xF600, 0xB400, self.disassemble_push_or_pop_reg_list),
-            (0xF000, 0xC000, self.disassemble_load_or_store_multiple),
-            (0xF000, 0xD000, self.disassemble_conditional_branch),
-            (0xFF00, 0xDF00, self.disassemble_software_interrupt),
-            (0xF800, 0xE000, self.disassemble_unconditional_branch),
-            # Not implemented: (0xF000, 0xF000, self.disassemble_bl_prefix),
-            # Not implemented: (0xF800, 0xF800, self.disassemble_bl_suffix),
-        ]
-        
-        # Returns the function (decoder) matching the instruction pattern, or None if no match
-        for (mask, expected_value, decoder) in PATTERNS:
-            if instr.value & mask == expected_value:
-                return decoder
-    
-    def disassemble(self, instr: RawThumbInstruction) -> str:
-        decoder = self.get_decoder(instr)
-        
-        return (decoder(instr) if decoder else None) or 'UNKNOWN'
-    
-    def disassemble_add_or_sub_reg(self, instr: RawThumbInstruction) -> str:
+    PATTERNS = ( # (mask, expected_value, decoder name)
+        (0xF800, 0x1800, 'disassemble_add_or_sub_reg'),
+        (0xE000, 0x0000, 'disassemble_shift_by_imm'),
+        (0xE000, 0x2000, 'disassemble_add_or_sub_or_cmp_or_mov_imm'),
+        (0xFC00, 0x4000, 'disassemble_dp_reg'),
+        (0xFC00, 0x4400, 'disassemble_special_dp'),
+        (0xF800, 0x4800, 'disassemble_load_from_literal_pool'),
+        (0xF000, 0x5000, 'disassemble_load_or_store_reg_offset'),
+        (0xE000, 0x6000, 'disassemble_load_or_store_word_or_byte_imm_offset'),
+        (0xF000, 0x8000, 'disassemble_load_or_store_halfword_imm_offset'),
+        (0xF000, 0x9000, 'disassemble_load_or_store_to_or_from_stack'),
+        (0xF000, 0xA000, 'disassemble_add_to_sp_or_pc'),
+        (0xFF00, 0xB000, 'disassemble_adjust_sp'),
+        (0xF600, 0xB400, 'disassemble_push_or_pop_reg_list'),
+        (0xF000, 0xC000, 'disassemble_load_or_store_multiple'),
+        (0xF000, 0xD000, 'disassemble_conditional_branch'),
+        (0xFF00, 0xDF00, 'disassemble_software_interrupt'),
+        (0xF800, 0xE000, 'disassemble_unconditional_branch'),
+        # Not implemented: BL, a 32-bit pair of a (0xF000, 0xF000) prefix and a (0xF800, 0xF800) suffix
+    )
+    
+    def __init__(self) -> None:
+        # Decoders are looked up on the class, so subclasses may override them, and kept unbound so the tables don't reference the instance
+        patterns = [(mask, expected_value, getattr(type(self), name)) for (mask, expected_value, name) in self.PATTERNS]
+        
+        # 65536-entry decode table indexed by the whole instruction, so decoding needs no shift at all
+        if any(mask & 0xFF for (mask, expected_value, decoder) in patterns): # Some pattern tests the low byte, so every value is matched
+            self._decode_table = [
+                next((decoder for (mask, expected_value, decoder) in patterns if value & mask == expected_value), None)
+                for value in range(0x10000)
+            ]
+        else: # Every mask lies within the top byte, so patterns are only matched once per value of bits 8-15
+            top_byte_decoders = [
+                next((decoder for (mask, expected_value, decoder) in patterns if (top << 8) & mask == expected_value), None)
+                for top in range(256)
+            ]
+            self._decode_table = [decoder for decoder in top_byte_decoders for _ in range(256)]
+        
+        # Disassembly is a pure function of the 16-bit value, so every result is kept in a flat cache once decoded
+        self._result_cache = [None] * 0x10000
+    
+    def get_decoder(self, instr: Union[RawThumbInstruction, int]):
+        # Returns the function (decoder) matching the instruction pattern, which takes the instruction value as an int, or None if no match
+        decoder = self._decode_table[instr.value if isinstance(instr, RawThumbInstruction) else instr & 0xFFFF]
+        return MethodType(decoder, self) if decoder else None
+    
+    def disassemble(self, instr: Union[RawThumbInstruction, int]) -> str:
+        value = instr.value if isinstance(instr, RawThumbInstruction) else instr & 0xFFFF
+        result = self._result_cache[value]
+        
+        if result is None:
+            result = self._result_cache[value] = self._disassemble_value(value)
+        
+        return result
+    
+    def disassemble_bytes(self, buf: Union[bytes, bytearray, memoryview]) -> list[str]:
+        '''Disassemble a buffer of little-endian Thumb instructions.'''
+        values = array('H')
+        values.frombytes(memoryview(buf).cast('B')) # Byte view of any buffer format; raises ValueError on a partial instruction
+        if sys.byteorder == 'big':
+            values.byteswap()
+        
+        result_cache = self._result_cache
+        disassemble_value = self._disassemble_value
+        result = []
+        
+        for v in values:
+            line = result_cache[v]
+            if line is None:
+                line = result_cache[v] = disassemble_value(v)
+            result.append(line)
+        
+        return result
+    
+    def _disassemble_value(self, value: int) -> str:
+        decoder = self.get_decoder(value)
+        
+        return (decoder(value) if decoder else None) or 'UNKNOWN'
+    
+    def disassemble_add_or_sub_reg(self, v: int) -> str:
         '''Disassemble Add/subtract register instructions.'''
-        i, op = [instr.get_bit(n) for n in (10, 9)]
-        rm_imm = instr.get_bits(6, 8)
-        rn = instr.get_bits(3, 5)
-        rd = instr.get_bits(0, 2)
+        i = (v >> 10) & 1
+        mnem = _ADD_OR_SUB_REG_MNEMONICS[(v >> 9) & 1]
+        rm_imm = (v >> 6) & 7
+        rn = (v >> 3) & 7
+        rd = v & 7
         
         if i:
-            return f"{'SUB' if op else 'ADD'}S r{rd}, r{rn}, #{rm_imm}"
+            return f'{mnem} {_REG[rd]}, {_REG[rn]}, #{rm_imm}'
         else:
-            return f"{'SUB' if op else 'ADD'}S r{rd}, r{rn}, r{rm_imm}"
+            return f'{mnem} {_REG[rd]}, {_REG[rn]}, {_REG[rm_imm]}'
     
-    def disassemble_shift_by_imm(self, instr: RawThumbInstruction) -> str:
+    def disassemble_shift_by_imm(self, v: int) -> str:
         '''Disassemble Shift by immediate instructions.'''
-        opcode = instr.get_bits(11, 12)
-        mnem = ['LSL', 'LSR', 'ASR'][opcode]
-        imm = instr.get_bits(6, 10)
-        rm = instr.get_bits(3, 5)
-        rd = instr.get_bits(0, 2)
+        mnem = _SHIFT_BY_IMM_MNEMONICS[(v >> 11) & 3]
+        imm = (v >> 6) & 0x1F
+        rm = (v >> 3) & 7
+        rd = v & 7
         
-        return f'{mnem}S r{rd}, r{rm}, #{imm}'
+        return f'{mnem} {_REG[rd]}, {_REG[rm]}, #{imm}'
     
-    def disassemble_add_or_sub_or_cmp_or_mov_imm(self, instr: RawThumbInstruction) -> str:
+    def disassemble_add_or_sub_or_cmp_or_mov_imm(self, v: int) -> str:
         '''Disassemble Add/subtract/compare/move immediate instructions.'''
-        opcode = instr.get_bits(11, 12)
-        mnem = ['MOVS', 'CMP', 'ADDS', 'SUBS'][opcode]
-        rd_rn = instr.get_bits(8, 10)
-        imm = instr.get_bits(0, 7)
+        mnem = _IMM_MNEMONICS[(v >> 11) & 3]
+        rd_rn = (v >> 8) & 7
+        imm = v & 0xFF
         
-        return f'{mnem} r{rd_rn}, #0x{imm:x}'
+        return f'{mnem} {_REG[rd_rn]}, #{_HEX10[imm]}'
     
-    def disassemble_dp_reg(self, instr: RawThumbInstruction) -> str:
+    def disassemble_dp_reg(self, v: int) -> str:
         '''Disassemble Data-processing register instructions.'''
-        OPCODES = [
-            'ANDS', 'EORS', 'LSLS', 'LSRS', 'ASRS', 'ADCS', 'SBCS', 'RORS',
-            'TST',  'NEGS', 'CMP',  'CMN',  'ORRS', 'MULS', 'BICS', 'MVNS'
-        ]
-        
-        op = instr.get_bits(6, 9)
-        mnem = OPCODES[op]
-        rm_rs = instr.get_bits(3, 5)
-        rd_rn = instr.get_bits(0, 2)
+        mnem = _DP_REG_MNEMONICS[(v >> 6) & 0xF]
+        rm_rs = (v >> 3) & 7
+        rd_rn = v & 7
         
-        return f'{mnem} r{rd_rn}, r{rm_rs}'
+        return f'{mnem} {_REG[rd_rn]}, {_REG[rm_rs]}'
     
-    def disassemble_special_dp(self, instr: RawThumbInstruction) -> str:
+    def disassemble_special_dp(self, v: int) -> str:
         '''Disassemble Special data processing instructions.'''
-        opcode = instr.get_bits(8, 9)
-        mnem = ['ADD', 'CMP', 'MOV', 'BX'][opcode]
-        h1, h2 = [instr.get_bit(n) for n in (7, 6)]
-        rm = instr.get_bits(3, 5)
-        rd_rn = instr.get_bits(0, 2)
+        mnem = _SPECIAL_DP_MNEMONICS[(v >> 8) & 3]
+        rm = (v >> 3) & 0xF # H2 is bit 3 of Rm
+        rd_rn = ((v >> 4) & 8) | (v & 7) # H1 is bit 3 of Rd/Rn
         
         if mnem == 'BX':
-            if h1 or rd_rn != 0: # SBZ
+            if rd_rn: # H1 and Rd/Rn are SBZ
                 return None
             
-            return f'BX r{rm+8 if h2 else rm}'
+            return f'BX {_REG[rm]}'
         
-        return f'{mnem} r{rd_rn+8 if h1 else rd_rn}, r{rm+8 if h2 else rm}'
+        return f'{mnem} {_REG[rd_rn]}, {_REG[rm]}'
     
-    def disassemble_load_from_literal_pool(self, instr: RawThumbInstruction) -> str:
+    def disassemble_load_from_literal_pool(self, v: int) -> str:
         '''Disassemble Load from literal pool instructions.'''
-        rd = instr.get_bits(8, 10)
-        offset = instr.get_bits(0, 7) * 4
+        rd = (v >> 8) & 7
+        offset = (v & 0xFF) * 4
         
-        return f'LDR r{rd}, [r15, #0x{offset:x}]'
+        return f'LDR {_REG[rd]}, [r15, #{_HEX10[offset]}]'
     
-    def disassemble_load_or_store_reg_offset(self, instr: RawThumbInstruction) -> str:
+    def disassemble_load_or_store_reg_offset(self, v: int) -> str:
         '''Disassemble Load/store register offset instructions.'''
-        opcode = instr.get_bits(9, 11)
-        mnem = ['STR', 'STRH', 'STRB', 'LDRSB', 'LDR', 'LDRH', 'LDRB', 'LDRSH'][opcode]
-        rm = instr.get_bits(6, 8)
-        rn = instr.get_bits(3, 5)
-        rd = instr.get_bits(0, 2)
+        mnem = _LOAD_STORE_REG_OFFSET_MNEMONICS[(v >> 9) & 7]
+        rm = (v >> 6) & 7
+        rn = (v >> 3) & 7
+        rd = v & 7
         
-        return f'{mnem} r{rd}, [r{rn}, r{rm}]'
+        return f'{mnem} {_REG[rd]}, [{_REG[rn]}, {_REG[rm]}]'
     
-    def disassemble_load_or_store_word_or_byte_imm_offset(self, instr: RawThumbInstruction) -> str:
+    def disassemble_load_or_store_word_or_byte_imm_offset(self, v: int) -> str:
         '''Disassemble Load/store word/byte immediate offset instructions.'''
-        b, l = [instr.get_bit(n) for n in (12, 11)]
-        imm = instr.get_bits(6, 10) * (1 if b else 4)
-        rn = instr.get_bits(3, 5)
-        rd = instr.get_bits(0, 2)
+        b = (v >> 12) & 1
+        mnem = _LOAD_STORE_WORD_OR_BYTE_MNEMONICS[(v >> 11) & 3]
+        imm = ((v >> 6) & 0x1F) * (1 if b else 4)
+        rn = (v >> 3) & 7
+        rd = v & 7
         
-        return f"{'LDR' if l else 'STR'}{'B' if b else ''} r{rd}, [r{rn}, #0x{imm:x}]"
+        return f'{mnem} {_REG[rd]}, [{_REG[rn]}, #{_HEX10[imm]}]'
     
-    def disassemble_load_or_store_halfword_imm_offset(self, instr: RawThumbInstruction) -> str:
+    def disassemble_load_or_store_halfword_imm_offset(self, v: int) -> str:
         '''Disassemble Load/store halfword immediate offset instructions.'''
-        l = instr.get_bit(11)
-        imm = instr.get_bits(6, 10) * 2
-        rn = instr.get_bits(3, 5)
-        rd = instr.get_bits(0, 2)
+        l = (v >> 11) & 1
+        imm = ((v >> 6) & 0x1F) * 2
+        rn = (v >> 3) & 7
+        rd = v & 7
         
-        return f"{'LDR' if l else 'STR'}H r{rd}, [r{rn}, #0x{imm:x}]"
+        return f"{'LDR' if l else 'STR'}H {_REG[rd]}, [{_REG[rn]}, #{_HEX10[imm]}]"
     
-    def disassemble_load_or_store_to_or_from_stack(self, instr: RawThumbInstruction) -> str:
+    def disassemble_load_or_store_to_or_from_stack(self, v: int) -> str:
         '''Disassemble Load/store to/from stack instructions.'''
-        l = instr.get_bit(11)
-        rd = instr.get_bits(8, 10)
-        offset = instr.get_bits(0, 7) * 4
+        l = (v >> 11) & 1
+        rd = (v >> 8) & 7
+        offset = (v & 0xFF) * 4
         
-        return f"{'LDR' if l else 'STR'} r{rd}, [r13, #0x{offset:x}]"
+        return f"{'LDR' if l else 'STR'} {_REG[rd]}, [r13, #{_HEX10[offset]}]"
     
-    def disassemble_add_to_sp_or_pc(self, instr: RawThumbInstruction) -> str:
+    def disassemble_add_to_sp_or_pc(self, v: int) -> str:
         '''Disassemble Add to SP or PC instructions.'''
-        sp = instr.get_bit(11)
-        rd = instr.get_bits(8, 10)
-        imm = instr.get_bits(0, 7) * 4
+        sp = (v >> 11) & 1
+        rd = (v >> 8) & 7
+        imm = (v & 0xFF) * 4
         
-        return f"ADD r{rd}, {'r13' if sp else 'r15'}, #0x{imm:x}"
+        return f"ADD {_REG[rd]}, {'r13' if sp else 'r15'}, #{_HEX10[imm]}"
     
-    def disassemble_adjust_sp(self, instr: RawThumbInstruction) -> str:
+    def disassemble_adjust_sp(self, v: int) -> str:
         '''Disassemble Adjust stack pointer instructions.'''
-        op = instr.get_bit(7)
-        imm = instr.get_bits(0, 6) * 4
+        mnem = _ADJUST_SP_MNEMONICS[(v >> 7) & 1]
+        imm = (v & 0x7F) * 4
         
-        return f"{'SUB' if op else 'ADD'} r13, #0x{imm:x}"
+        return f'{mnem} r13, #{_HEX10[imm]}'
     
-    def disassemble_push_or_pop_reg_list(self, instr: RawThumbInstruction) -> str:
+    def disassemble_push_or_pop_reg_list(self, v: int) -> str:
         '''Disassemble Push/pop register list instructions.'''
-        l, r = [instr.get_bit(n) for n in (11, 8)]
-        reg_list = instr.get_bits(0, 7)
+        l = (v >> 11) & 1
+        r = (v >> 8) & 1
+        reg_list = v & 0xFF
         
         if not (r or reg_list):
             return None
         
-        registers = [f'r{i}' for i in range(8) if reg_list & (1 << i)]
+        registers = _REGLIST8[reg_list]
         
-        if r:
-            registers.append(f"{'r15' if l else 'r14'}")
+        if r: # Extra register is r15 for POP and r14 for PUSH
+            extra = 'r15' if l else 'r14'
+            registers = f'{registers}, {extra}' if reg_list else extra
         
-        return f"{'POP' if l else 'PUSH'} {{{', '.join(registers)}}}"
+        return f"{'POP' if l else 'PUSH'} {{{registers}}}"
     
-    def disassemble_load_or_store_multiple(self, instr: RawThumbInstruction) -> str:
+    def disassemble_load_or_store_multiple(self, v: int) -> str:
         '''Disassemble Load/store multiple instructions.'''
-        l = instr.get_bit(11)
-        rn = instr.get_bits(8, 10)
-        reg_list = instr.get_bits(0, 7)
+        l = (v >> 11) & 1
+        rn = (v >> 8) & 7
+        reg_list = v & 0xFF
         
         if not reg_list:
             return None
         
-        registers = [f'r{i}' for i in range(8) if reg_list & (1 << i)]
-        
-        return f"{'LDM' if l else 'STM'}IA r{rn}!, {{{', '.join(registers)}}}"
+        return f"{'LDM' if l else 'STM'}IA {_REG[rn]}!, {{{_REGLIST8[reg_list]}}}"
     
-    def disassemble_conditional_branch(self, instr: RawThumbInstruction) -> str:
+    def disassemble_conditional_branch(self, v: int) -> str:
         '''Disassemble Conditional branch instructions.'''
-        CONDITION_CODES = [
-            'EQ', 'NE', 'CS', 'CC', 'MI', 'PL', 'VS', 'VC',
-            'HI', 'LS', 'GE', 'LT', 'GT', 'LE', 'AL', 'NV' # 'NV' cond may be ignored in the future
-        ]
-        
-        cond_code = CONDITION_CODES[instr.get_bits(8, 11)]
-        cond = '' if cond_code == 'AL' else cond_code
-        imm = instr.get_bits(0, 7) << 1
-        
-        if imm & (1 << 8): # Sign-extend immediate
-            imm |= ~((1 << 9) - 1)
-        
-        imm = (imm + 4) & 0xFFFFFFFF
-        
-        return f'B{cond} #0x{imm:x}'
+        return f'{_COND_BRANCH_MNEMONICS[(v >> 8) & 0xF]} {_COND_BRANCH_TARGETS[v & 0xFF]}'
     
-    def disassemble_software_interrupt(self, instr: RawThumbInstruction) -> str:
+    def disassemble_software_interrupt(self, v: int) -> str:
         '''Disassemble Software interrupt instructions.'''
-        imm = instr.get_bits(0, 7)
+        imm = v & 0xFF
         
-        return f'SWI 0x{imm:x}'
+        return f'SWI {_HEX10[imm]}'
     
-    def disassemble_unconditional_branch(self, instr: RawThumbInstruction) -> str:
+    def disassemble_unconditional_branch(self, v: int) -> str:
         '''Disassemble Unconditional branch instructions.'''
-        imm = instr.get_bits(0, 10) << 1
-        
-        if imm & (1 << 11): # Sign-extend immediate
-            imm |= ~((1 << 12) - 1)
-        
-        imm = (imm + 4) & 0xFFFFFFFF
-        
-        return f'B 0x{imm:x}'
-    
-    def disassemble_bl_prefix(self):
-        raise NotImplemented
-    
-    def disassemble_bl_suffix(self):
-        raise NotImplemented
+        return f'B {_BRANCH_TARGETS[v & 0x7FF]}'
@@ -2,12 +2,8 @@ from archstone import RawArmInstruction, Armv4TDisassembler
 
 def parse_instruction(instr_str: str) -> int:
     instr_str = instr_str.strip().lower()
-    if instr_str.startswith('0x'):
-        return int(instr_str, 16)
-    elif instr_str.startswith('0o'):
-        return int(instr_str, 8)
-    elif instr_str.startswith('0b'):
-        return int(instr_str, 2)
+    if instr_str[:2] in ('0x', '0o', '0b'):
+        return int(instr_str, 0) # Base is taken from the prefix
     else:
         return int(instr_str, 16)
 